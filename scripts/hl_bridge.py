@@ -8,63 +8,247 @@ Usage:
   python hl_bridge.py cancel BTC <oid>
   python hl_bridge.py positions
   python hl_bridge.py balance
+  python hl_bridge.py order_batch --orders-json <path|->
+  python hl_bridge.py cancel_batch --cancels-json <path|->
   
 With agent wallet (for user wallets):
   python hl_bridge.py --agent-key=<key> --master=<addr> order BTC buy 0.001
   python hl_bridge.py --agent-key=<key> --master=<addr> close_all
+
+With the caller's timeout, so every HTTP call is cut short and the command answers first:
+  python hl_bridge.py --timeout-ms=15000 order BTC buy 0.001
+
+Daemon mode (one warm interpreter, line-delimited JSON on stdin/stdout):
+  python hl_bridge.py serve
+  > {"id": 1, "argv": ["--agent-key=<key>", "--master=<addr>", "order", "BTC", "buy", "0.001"]}
+  < {"id": 1, "result": {"success": true, ...}}
+  Back-to-back `order` requests for the same wallet that arrive within HL_COALESCE_WINDOW_MS
+  are signed and posted together as one bulk order; each still gets its own response.
+
+Optional speedups, used when installed: orjson (output), coincurve (eth_keys picks it
+up as the C secp256k1 backend for signing).
 """
 
 import sys
 import os
 import json
+import queue
+import threading
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+try:
+    import orjson
+    
+    _dumpb = orjson.dumps
+    _load = orjson.loads
+except ImportError:  # optional: stdlib json is slower on large payloads
+    def _dumpb(obj):
+        return json.dumps(obj).encode()
+    
+    _load = json.loads
+
+class JsonStream:
+    """A JSON array that emit() writes element by element instead of materializing it"""
+    
+    def __init__(self, items):
+        self.items = items
+        self.error = None  # set if an item failed mid-stream
+
+def _has_stream(obj):
+    return isinstance(obj, JsonStream) or (isinstance(obj, dict) and any(_has_stream(v) for v in obj.values()))
+
+def _write_json(write, obj):
+    """Write obj, streaming any JsonStream inside (nested) dicts. Returns False if a stream broke."""
+    if isinstance(obj, JsonStream):
+        write(b"[")
+        try:
+            for i, item in enumerate(obj.items):
+                if i:
+                    write(b",")
+                write(_dumpb(item))
+        except Exception as e:
+            # Close the array so the line is still valid JSON, then flag it
+            write(b"]")
+            obj.error = str(e)
+            return False
+        write(b"]")
+        return True
+    if not _has_stream(obj):
+        write(_dumpb(obj))
+        return True
+    
+    ok = True
+    write(b"{")
+    for i, (key, value) in enumerate(obj.items()):
+        if i:
+            write(b",")
+        write(_dumpb(key) + b":")
+        if not _write_json(write, value):
+            ok = False
+            if isinstance(value, JsonStream):  # a nested dict already flagged its own stream
+                write(b',"streamError":' + _dumpb(value.error))
+    write(b"}")
+    return ok
+
+def emit(obj, out=None):
+    """Write one JSON line as bytes (no str round trip) and flush so a pipe reader sees it now"""
+    out = out or sys.stdout
+    try:
+        if _has_stream(obj):
+            try:
+                _write_json(out.buffer.write, obj)
+            finally:
+                # Always end the line, so a value that fails to serialize mid-write
+                # can't run into the next response
+                out.buffer.write(b"\n")
+        else:
+            out.buffer.write(_dumpb(obj) + b"\n")
+    finally:
+        out.flush()
+
 # Load .env file
 load_dotenv()
 
-from hyperliquid.info import Info
-from hyperliquid.exchange import Exchange
 from hyperliquid.utils import constants
-from eth_account import Account
+
+# Heavy modules (SDK, eth_account, requests) are imported on first use,
+# so usage errors and read-only commands don't pay for what they never touch
+API = None
+Info = None
+Exchange = None
+Account = None
 
 # Global variables for agent wallet override
 AGENT_PRIVATE_KEY = None
 MASTER_ADDRESS = None
 
-def parse_agent_args():
-    """Parse --agent-key and --master arguments"""
-    global AGENT_PRIVATE_KEY, MASTER_ADDRESS
+# Short-lived read caches so back-to-back commands (positions -> close_all) share one snapshot
+MIDS_TTL_SECS = 0.25
+USER_STATE_TTL_SECS = 0.1
+_MIDS_CACHE = (0.0, None)
+
+# Daemon only: allMids pushed over the websocket, used while fresher than the max age.
+# allMids arrives about every block, so a longer gap means the feed stalled: fall back
+# to REST before market orders (0.1% through the mid) get priced off a stale snapshot
+MIDS_STREAM_MAX_AGE_SECS = 1.0
+_MIDS_STREAM = {}
+_MIDS_STREAM_AT = 0.0
+_WS_INFO = None
+_USER_STATE_CACHE = {}  # address -> (fetched_at, state)
+
+# Commands that change account state; cached user_state is dropped after them
+SIGNED_COMMANDS = {"order", "cancel", "trigger", "close_all", "cancel_all", "order_batch", "cancel_batch"}
+
+# close_all crosses the book this far past the level that fills the whole position
+CLOSE_BUFFER = 0.001
+
+# Client-side HTTP timeouts (connect, read) per call. A timed-out order or cancel
+# may still have gone through.
+HTTP_TIMEOUT = (
+    float(os.getenv("HL_CONNECT_TIMEOUT_SECS", "3")),
+    float(os.getenv("HL_READ_TIMEOUT_SECS", "8")),
+)
+TIMEOUT_HINT = "request may or may not have reached the exchange"
+
+# Failed connects are retried this many times (never reads: that could double-submit)
+CONNECT_RETRIES = 2
+RETRY_BACKOFF_SECS = 0.3  # worst-case total sleep between those retries (backoff_factor=0.1)
+
+# With --timeout-ms (the caller's own timeout), every HTTP call of a command is clamped
+# so the command answers this long before the caller gives up and kills the bridge
+DEADLINE_MARGIN_SECS = 1.0
+_TIMEOUT_SECS = None  # from the current request's --timeout-ms
+_DEADLINE = None  # monotonic time the running command must answer by
+
+# Max orders/cancels signed together in one bulk action
+BATCH_SIZE = 50
+
+# Daemon mode: plain `order` requests for the same signer that arrive within this window
+# share one bulk_orders action (0 disables)
+COALESCE_WINDOW_SECS = float(os.getenv("HL_COALESCE_WINDOW_MS", "1")) / 1000
+
+# Worker threads for independent HTTP reads (requests releases the GIL while waiting)
+_POOL = ThreadPoolExecutor(max_workers=8)
+
+# Long-lived SDK clients, reused across commands when running as a daemon
+_SESSION = None
+_INFO = None
+_EXCHANGE_CACHE = {}
+_ACCOUNT_CACHE = {}  # private key -> LocalAccount
+
+# Exchange metadata, fetched once and shared by Info and every Exchange
+_META = None
+_SPOT_META = None
+_SZ_DECIMALS = {}
+_META_LOADED_AT = 0.0
+META_REFRESH_MIN_SECS = 60  # Don't refetch meta more often than this for unknown coins
+_SERVING = False
+
+# Built once at import; the daemon reuses it for every request
+_AGENT_ARGS = argparse.ArgumentParser(add_help=False, allow_abbrev=False, exit_on_error=False)
+_AGENT_ARGS.add_argument("--agent-key")
+_AGENT_ARGS.add_argument("--master")
+_AGENT_ARGS.add_argument("--timeout-ms", type=float)
+
+def parse_agent_args(argv):
+    """Parse --agent-key, --master and --timeout-ms arguments, return the remaining argv"""
+    global AGENT_PRIVATE_KEY, MASTER_ADDRESS, _TIMEOUT_SECS
     
-    new_argv = []
-    for arg in sys.argv:
-        if arg.startswith("--agent-key="):
-            AGENT_PRIVATE_KEY = arg.split("=", 1)[1]
-        elif arg.startswith("--master="):
-            MASTER_ADDRESS = arg.split("=", 1)[1]
-        else:
-            new_argv.append(arg)
+    # Raises argparse.ArgumentError (not SystemExit) on a flag without a value
+    ns, rest = _AGENT_ARGS.parse_known_args(argv)
+    
+    # Always assigned, so a daemon request never inherits the previous caller's wallet
+    AGENT_PRIVATE_KEY = ns.agent_key
+    MASTER_ADDRESS = ns.master
+    _TIMEOUT_SECS = ns.timeout_ms / 1000 if ns.timeout_ms else None
     
-    sys.argv = new_argv
+    return rest
+
+def _get_account(private_key):
+    """Account.from_key, derived once per key"""
+    account = _ACCOUNT_CACHE.get(private_key)
+    if account is None:
+        account = Account.from_key(private_key)
+        _ACCOUNT_CACHE[private_key] = account
+    return account
 
 def get_exchange():
     """Get exchange instance - uses agent wallet if provided, otherwise env vars"""
-    global AGENT_PRIVATE_KEY, MASTER_ADDRESS
+    global AGENT_PRIVATE_KEY, MASTER_ADDRESS, Exchange, Account
     
     # Use agent wallet if provided
     if AGENT_PRIVATE_KEY and MASTER_ADDRESS:
-        wallet = Account.from_key(AGENT_PRIVATE_KEY)
-        exchange = Exchange(wallet, constants.MAINNET_API_URL, account_address=MASTER_ADDRESS)
-        return exchange, None
-    
-    # Fallback to env vars
-    private_key = os.getenv("HL_PRIVATE_KEY")
-    account_address = os.getenv("HL_ACCOUNT_ADDRESS")
+        private_key = AGENT_PRIVATE_KEY
+        account_address = MASTER_ADDRESS
+    else:
+        # Fallback to env vars
+        private_key = os.getenv("HL_PRIVATE_KEY")
+        account_address = os.getenv("HL_ACCOUNT_ADDRESS")
     
     if not private_key:
         return None, "HL_PRIVATE_KEY not set"
     
-    wallet = Account.from_key(private_key)
-    exchange = Exchange(wallet, constants.MAINNET_API_URL, account_address=account_address)
+    key = (private_key, account_address)
+    exchange = _EXCHANGE_CACHE.get(key)
+    if exchange is None:
+        if Exchange is None:
+            from hyperliquid.exchange import Exchange
+            from eth_account import Account
+        meta, spot_meta = get_meta()
+        wallet = _get_account(private_key)
+        exchange = Exchange(
+            wallet,
+            constants.MAINNET_API_URL,
+            meta=meta,
+            account_address=account_address,
+            spot_meta=spot_meta,
+        )
+        use_shared_session(exchange)
+        use_shared_session(exchange.info)
+        _EXCHANGE_CACHE[key] = exchange
     return exchange, None
 
 def get_account_address():
@@ -76,25 +260,186 @@ def get_account_address():
     # Fallback to env var
     return os.getenv("HL_ACCOUNT_ADDRESS")
 
+def get_session():
+    """One pooled keep-alive session shared by every SDK client, so TLS is negotiated once"""
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        _SESSION = requests.Session()
+        _SESSION.headers.update({"Content-Type": "application/json"})
+        # Only retry failed connects: a read retry could submit the same order twice
+        retry = Retry(total=CONNECT_RETRIES, connect=CONNECT_RETRIES, read=0, status=0, backoff_factor=0.1)
+        _SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+        _SESSION.request = _with_deadline(_SESSION.request)
+    return _SESSION
+
+def start_deadline():
+    """Start the running command's deadline from the parsed --timeout-ms (if any)"""
+    global _DEADLINE
+    _DEADLINE = time.monotonic() + _TIMEOUT_SECS - DEADLINE_MARGIN_SECS if _TIMEOUT_SECS else None
+
+def _deadline_timeout(timeout):
+    """Shrink a (connect, read) timeout so every connect attempt plus the read ends by _DEADLINE"""
+    from requests.exceptions import Timeout
+    
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    remaining = _DEADLINE - time.monotonic() - RETRY_BACKOFF_SECS
+    attempts = CONNECT_RETRIES + 1
+    connect = min(connect, remaining / (2 * attempts))
+    read = min(read, remaining - attempts * connect)
+    if connect <= 0 or read <= 0:
+        raise Timeout("command deadline reached")
+    return connect, read
+
+def _with_deadline(request):
+    """Wrap Session.request so each call fits in what is left of the command's deadline"""
+    def request_by_deadline(method, url, **kwargs):
+        if _DEADLINE is not None:
+            kwargs["timeout"] = _deadline_timeout(kwargs.get("timeout") or HTTP_TIMEOUT)
+        return request(method, url, **kwargs)
+    return request_by_deadline
+
+def use_shared_session(client):
+    """Point an SDK API client (Info, Exchange, API) at the shared session, with HTTP_TIMEOUT"""
+    client.session.close()
+    client.session = get_session()
+    # API.post passes self.timeout to session.post
+    client.timeout = HTTP_TIMEOUT
+    return client
+
+def is_timeout(e):
+    """True if `e` is a requests connect/read timeout"""
+    from requests.exceptions import Timeout
+    return isinstance(e, Timeout)
+
+def _action_error(e):
+    """Error status for a failed signed action"""
+    if is_timeout(e):
+        return {"error": "timeout", "hint": TIMEOUT_HINT}
+    return {"error": str(e)}
+
+def get_meta():
+    """Fetch perp and spot metadata once; Info/Exchange reuse it instead of refetching"""
+    global _META, _SPOT_META, _SZ_DECIMALS, _META_LOADED_AT, API
+    if _META is None:
+        if API is None:
+            from hyperliquid.api import API
+        api = use_shared_session(API(constants.MAINNET_API_URL))
+        _META = api.post("/info", {"type": "meta"})
+        _SPOT_META = api.post("/info", {"type": "spotMeta"})
+        _SZ_DECIMALS = {u["name"]: u["szDecimals"] for u in _META["universe"]}
+        _META_LOADED_AT = time.monotonic()
+    return _META, _SPOT_META
+
+def refresh_meta():
+    """Refetch metadata and update the cached clients in place (e.g. after a new listing)"""
+    global _META
+    _META = None
+    meta, _ = get_meta()
+    if _INFO is not None:
+        _INFO.set_perp_meta(meta, 0)
+    for exchange in _EXCHANGE_CACHE.values():
+        exchange.info.set_perp_meta(meta, 0)
+
+def get_sz_decimals(coin):
+    """Size decimals for a perp, from the live exchange metadata"""
+    get_meta()
+    if coin not in _SZ_DECIMALS and time.monotonic() - _META_LOADED_AT > META_REFRESH_MIN_SECS:
+        # Listed after we loaded meta? Reload before falling back
+        refresh_meta()
+    return _SZ_DECIMALS.get(coin, 2)
+
+def round_order_px(coin, px):
+    """Round a limit/trigger price to what HL accepts: 5 significant figures, at most 6 - szDecimals decimals
+    
+    Every order path (order, order_batch, trigger, close_all) uses this, so a price
+    never goes out rounded two different ways.
+    """
+    return round(float(f"{px:.5g}"), max(0, 6 - get_sz_decimals(coin)))
+
+def round_size(coin, size):
+    """Round an order size to the coin's size decimals (int for whole-unit coins)"""
+    sz_decimals = get_sz_decimals(coin)
+    size = round(size, sz_decimals)
+    if sz_decimals == 0:
+        size = int(size)
+    return size
+
 def get_info():
-    return Info(constants.MAINNET_API_URL, skip_ws=True)
+    global _INFO, Info
+    if _INFO is None:
+        if Info is None:
+            from hyperliquid.info import Info
+        meta, spot_meta = get_meta()
+        _INFO = use_shared_session(Info(constants.MAINNET_API_URL, skip_ws=True, meta=meta, spot_meta=spot_meta))
+    return _INFO
+
+def _on_all_mids(msg):
+    global _MIDS_STREAM_AT
+    _MIDS_STREAM.update({coin: float(px) for coin, px in msg["data"]["mids"].items()})
+    _MIDS_STREAM_AT = time.monotonic()
+
+def start_mids_stream():
+    """Subscribe to allMids so order paths read mids from memory instead of REST"""
+    global _WS_INFO, Info
+    if Info is None:
+        from hyperliquid.info import Info
+    meta, spot_meta = get_meta()
+    _WS_INFO = Info(constants.MAINNET_API_URL, skip_ws=False, meta=meta, spot_meta=spot_meta)
+    _WS_INFO.subscribe({"type": "allMids"}, _on_all_mids)
+
+def stop_mids_stream():
+    global _WS_INFO
+    if _WS_INFO is not None:
+        _WS_INFO.disconnect_websocket()
+        _WS_INFO = None
+
+def cached_mids(ttl=MIDS_TTL_SECS):
+    """Mid prices: the websocket stream if live, else all_mids() reused for `ttl` seconds"""
+    global _MIDS_CACHE
+    if _MIDS_STREAM and time.monotonic() - _MIDS_STREAM_AT < MIDS_STREAM_MAX_AGE_SECS:
+        return _MIDS_STREAM
+    
+    fetched_at, mids = _MIDS_CACHE
+    now = time.monotonic()
+    if mids is None or now - fetched_at >= ttl:
+        mids = get_info().all_mids()
+        _MIDS_CACHE = (now, mids)
+    return mids
+
+def get_mid(coin, mids=None):
+    """Mid price for one coin from `mids` (default cached_mids()), falling back to REST if missing"""
+    px = (mids if mids is not None else cached_mids()).get(coin)
+    if px is None:
+        px = get_info().all_mids().get(coin, 0)
+    return float(px)
+
+def cached_user_state(address, ttl=USER_STATE_TTL_SECS):
+    """user_state(address), reused for `ttl` seconds"""
+    fetched_at, state = _USER_STATE_CACHE.get(address, (0.0, None))
+    now = time.monotonic()
+    if state is None or now - fetched_at >= ttl:
+        state = get_info().user_state(address)
+        _USER_STATE_CACHE[address] = (now, state)
+    return state
 
 def cmd_balance():
-    info = get_info()
     account_address = get_account_address()
-    state = info.user_state(account_address)
+    state = cached_user_state(account_address)
     
     result = {
         "success": True,
         "accountValue": state.get("marginSummary", {}).get("accountValue", "0"),
         "withdrawable": state.get("withdrawable", "0"),
     }
-    print(json.dumps(result))
+    return result
 
 def cmd_positions():
-    info = get_info()
     account_address = get_account_address()
-    state = info.user_state(account_address)
+    state = cached_user_state(account_address)
     
     positions = []
     for pos in state.get("assetPositions", []):
@@ -109,146 +454,330 @@ def cmd_positions():
             })
     
     result = {"success": True, "positions": positions}
-    print(json.dumps(result))
+    return result
 
-def cmd_order(coin, side, size, price=None):
-    exchange, error = get_exchange()
-    if error:
-        print(json.dumps({"success": False, "error": error}))
-        return
+def run_parallel(*calls):
+    """Run independent zero-argument calls concurrently and return their results in order"""
+    futures = [_POOL.submit(call) for call in calls]
+    return [f.result() for f in futures]
+
+def _chunks(items, size=BATCH_SIZE):
+    """Split a list into consecutive chunks of at most `size` items"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def _batch_statuses(result, count):
+    """Extract per-item statuses from a bulk response, padded to `count`"""
+    statuses = []
+    if result.get("status") == "ok":
+        data = result.get("response", {}).get("data", {})
+        statuses = data.get("statuses", []) if isinstance(data, dict) else []
+    return statuses + [None] * (count - len(statuses))
+
+def _bulk_orders(exchange, orders):
+    """Submit orders through exchange.bulk_orders, one signature per chunk.
     
-    info = get_info()
+    Returns one (top-level result status, per-order status or error) tuple per order.
+    """
+    from hyperliquid.utils.signing import order_request_to_order_wire
+    
+    # Build each order's wire up front, as bulk_orders will: the SDK raises on an unknown
+    # coin or a size/price it can't encode, which would otherwise fail every order in the chunk
+    results = [None] * len(orders)
+    valid = []
+    for i, o in enumerate(orders):
+        if o["coin"] not in exchange.info.name_to_coin:
+            results[i] = (None, {"error": f"Unknown coin: {o['coin']}"})
+            continue
+        try:
+            order_request_to_order_wire(o, exchange.info.name_to_asset(o["coin"]))
+        except Exception as e:
+            results[i] = (None, {"error": str(e)})
+            continue
+        valid.append(i)
+    
+    # Chunks go out one after another: HL nonces are per-signer ms timestamps,
+    # so concurrent signed actions could collide and be rejected
+    for chunk in _chunks(valid):
+        batch = [orders[i] for i in chunk]
+        try:
+            result = exchange.bulk_orders(batch)
+        except Exception as e:
+            for i in chunk:
+                results[i] = (None, _action_error(e))
+            continue
+        if result.get("status") != "ok":
+            for i in chunk:
+                results[i] = (result.get("status"), {"error": str(result)})
+            continue
+        for i, status in zip(chunk, _batch_statuses(result, len(chunk))):
+            results[i] = (result.get("status"), status)
+    return results
+
+def _bulk_cancel(exchange, cancels):
+    """Cancel through exchange.bulk_cancel, one signature per chunk.
+    
+    Returns one error string (None on success) per cancel request.
+    """
+    # Resolve coins against the cached meta up front: the SDK raises on an unknown
+    # coin, which would otherwise fail every cancel in that chunk
+    errors = [None] * len(cancels)
+    by_coin = {}
+    for i, c in enumerate(cancels):
+        if c["coin"] in exchange.info.name_to_coin:
+            by_coin.setdefault(c["coin"], []).append(i)
+        else:
+            errors[i] = f"Unknown coin: {c['coin']}"
+    
+    # Mixed-coin cancels share one action; keep each coin's orders together across chunks
+    indices = [i for coin_indices in by_coin.values() for i in coin_indices]
+    for chunk in _chunks(indices):
+        batch = [cancels[i] for i in chunk]
+        try:
+            result = exchange.bulk_cancel(batch)
+        except Exception as e:
+            for i in chunk:
+                errors[i] = _action_error(e)["error"]
+            continue
+        if result.get("status") != "ok":
+            for i in chunk:
+                errors[i] = str(result)
+            continue
+        for i, status in zip(chunk, _batch_statuses(result, len(chunk))):
+            if isinstance(status, dict) and status.get("error"):
+                errors[i] = status["error"]
+    return errors
+
+def _order_status_result(status):
+    """Turn one order status from the exchange into a bridge result"""
+    if status is None:
+        # Padding from _batch_statuses: the exchange never acknowledged this order
+        return {"success": False, "error": "Unknown order status: no status returned for this order"}
+    if not isinstance(status, dict):
+        return {"success": True, "status": status}
+    if status.get("error"):
+        if status.get("hint"):
+            return {"success": False, "error": status["error"], "hint": status["hint"]}
+        return {"success": False, "error": status["error"]}
+    if status.get("filled"):
+        return {
+            "success": True,
+            "filled": True,
+            "oid": status["filled"].get("oid"),
+            "avgPx": status["filled"].get("avgPx"),
+            "totalSz": status["filled"].get("totalSz"),
+        }
+    if status.get("resting"):
+        return {
+            "success": True,
+            "filled": False,
+            "oid": status["resting"].get("oid"),
+        }
+    return {"success": True, "status": status}
+
+def _build_order(coin, side, size, price=None):
+    """Size and price one order the way cmd_order sends it, as an SDK order request"""
     is_buy = side.lower() == "buy"
-    size = float(size)
-    
-    # Size decimals per asset (from Hyperliquid docs)
-    SZ_DECIMALS = {
-        'BTC': 4, 'ETH': 3, 'SOL': 2, 'XRP': 0, 'BNB': 2, 'DOGE': 0,
-        'ADA': 0, 'AVAX': 2, 'DOT': 1, 'LINK': 1, 'LTC': 2, 'BCH': 2,
-        'MATIC': 0, 'ARB': 0, 'OP': 0, 'SUI': 0, 'APT': 1, 'ATOM': 1,
-        'UNI': 1, 'NEAR': 0, 'FIL': 1, 'AAVE': 2, 'INJ': 1, 'TIA': 1,
-        'SEI': 0, 'FTM': 0, 'MKR': 3, 'TON': 1, 'TRX': 0, 'ETC': 1,
-        'HYPE': 1, 'MEGA': 0, 'PEPE': 0, 'WIF': 0, 'BONK': 0, 'TAO': 2,
-    }
-    sz_decimals = SZ_DECIMALS.get(coin, 2)
-    size = round(size, sz_decimals)
-    if sz_decimals == 0:
-        size = int(size)
+    size = round_size(coin, float(size))
     
     # Get current price if not provided
     if price is None or price == "market":
-        all_mids = info.all_mids()
-        current_price = float(all_mids.get(coin, 0))
+        current_price = get_mid(coin)
         # For market orders, use IOC with a price slightly worse than market
         if is_buy:
-            price = round(current_price * 1.001)  # 0.1% above for buy
+            price = round_order_px(coin, current_price * 1.001)  # 0.1% above for buy
         else:
-            price = round(current_price * 0.999)  # 0.1% below for sell
+            price = round_order_px(coin, current_price * 0.999)  # 0.1% below for sell
         order_type = {"limit": {"tif": "Ioc"}}  # Immediate or cancel
     elif price == "limit_open":
         # Place a limit order that will stay open (for testing)
-        all_mids = info.all_mids()
-        current_price = float(all_mids.get(coin, 0))
+        current_price = get_mid(coin)
         if is_buy:
-            price = round(current_price * 0.95)  # 5% below for buy limit
+            price = round_order_px(coin, current_price * 0.95)  # 5% below for buy limit
         else:
-            price = round(current_price * 1.05)  # 5% above for sell limit
+            price = round_order_px(coin, current_price * 1.05)  # 5% above for sell limit
         order_type = {"limit": {"tif": "Gtc"}}  # Good till cancel
     else:
-        # Keep price precision based on value
-        price_float = float(price)
-        if price_float < 1:
-            price = round(price_float, 5)  # 5 decimals for very cheap assets
-        elif price_float < 10:
-            price = round(price_float, 4)  # 4 decimals
-        elif price_float < 100:
-            price = round(price_float, 3)  # 3 decimals
-        elif price_float < 1000:
-            price = round(price_float, 2)  # 2 decimals
-        else:
-            price = round(price_float, 1)  # 1 decimal for expensive assets
+        price = round_order_px(coin, float(price))
         order_type = {"limit": {"tif": "Gtc"}}
     
+    return {"coin": coin, "is_buy": is_buy, "sz": size, "limit_px": price, "order_type": order_type, "reduce_only": False}
+
+def cmd_order(coin, side, size, price=None):
+    exchange, error = get_exchange()
+    if error:
+        return {"success": False, "error": error}
+    
+    o = _build_order(coin, side, size, price)
     try:
-        result = exchange.order(coin, is_buy, size, price, order_type)
+        result = exchange.order(o["coin"], o["is_buy"], o["sz"], o["limit_px"], o["order_type"])
         
         if result.get("status") == "ok":
             statuses = result.get("response", {}).get("data", {}).get("statuses", [])
             if statuses:
-                status = statuses[0]
-                if status.get("error"):
-                    print(json.dumps({"success": False, "error": status["error"]}))
-                elif status.get("filled"):
-                    print(json.dumps({
-                        "success": True,
-                        "filled": True,
-                        "oid": status["filled"].get("oid"),
-                        "avgPx": status["filled"].get("avgPx"),
-                        "totalSz": status["filled"].get("totalSz"),
-                    }))
-                elif status.get("resting"):
-                    print(json.dumps({
-                        "success": True,
-                        "filled": False,
-                        "oid": status["resting"].get("oid"),
-                    }))
-                else:
-                    print(json.dumps({"success": True, "status": status}))
+                return _order_status_result(statuses[0])
             else:
-                print(json.dumps({"success": True, "result": result}))
+                return {"success": True, "result": result}
         else:
-            print(json.dumps({"success": False, "error": str(result)}))
+            return {"success": False, "error": str(result)}
     except Exception as e:
-        print(json.dumps({"success": False, "error": str(e)}))
+        return {"success": False, **_action_error(e)}
 
 def cmd_cancel(coin, oid):
     exchange, error = get_exchange()
     if error:
-        print(json.dumps({"success": False, "error": error}))
-        return
+        return {"success": False, "error": error}
     
     try:
         result = exchange.cancel(coin, int(oid))
         if result.get("status") == "ok":
-            print(json.dumps({"success": True}))
+            return {"success": True}
         else:
-            print(json.dumps({"success": False, "error": str(result)}))
+            return {"success": False, "error": str(result)}
     except Exception as e:
-        print(json.dumps({"success": False, "error": str(e)}))
+        return {"success": False, **_action_error(e)}
+
+def _safe_l2_snapshot(info, coin):
+    """l2_snapshot(coin), or None if it can't be fetched (the close then prices off the mid)"""
+    try:
+        return info.l2_snapshot(coin)
+    except Exception:
+        return None
+
+def _close_price(coin, is_buy, size, book):
+    """IOC price that consumes `size` on the opposite side of `book`, plus CLOSE_BUFFER.
+    
+    Walks asks for a buy (bids for a sell) until the cumulative size covers the
+    position; if the book is missing or too thin, prices off the deepest level seen
+    or, failing that, the mid.
+    """
+    levels = book.get("levels", [[], []])[1 if is_buy else 0] if book else []
+    px = None
+    filled = 0.0
+    for level in levels:
+        px = float(level["px"])
+        filled += float(level["sz"])
+        if filled >= size:
+            break
+    if px is None:
+        px = get_mid(coin)
+    px *= (1 + CLOSE_BUFFER) if is_buy else (1 - CLOSE_BUFFER)
+    return round_order_px(coin, px)
 
 def cmd_close_all():
     exchange, error = get_exchange()
     if error:
-        print(json.dumps({"success": False, "error": error}))
-        return
+        return {"success": False, "error": error}
     
     info = get_info()
     account_address = get_account_address()
-    state = info.user_state(account_address)
+    state = cached_user_state(account_address)
     
-    closed = []
-    for pos in state.get("assetPositions", []):
-        p = pos.get("position", {})
+    positions = [
+        pos.get("position", {}) for pos in state.get("assetPositions", [])
+        if float(pos.get("position", {}).get("szi", "0")) != 0
+    ]
+    
+    # One book per coin, fetched concurrently
+    books = run_parallel(*[
+        (lambda coin=p.get("coin", ""): _safe_l2_snapshot(info, coin)) for p in positions
+    ])
+    
+    orders = []
+    for p, book in zip(positions, books):
         size = float(p.get("szi", "0"))
-        if size != 0:
-            coin = p.get("coin", "")
-            is_buy = size < 0  # Close by doing opposite
-            abs_size = abs(size)
-            
-            all_mids = info.all_mids()
-            current_price = float(all_mids.get(coin, 0))
-            if is_buy:
-                price = round(current_price * 1.001)
-            else:
-                price = round(current_price * 0.999)
-            
-            try:
-                result = exchange.order(coin, is_buy, abs_size, price, {"limit": {"tif": "Ioc"}})
-                closed.append({"coin": coin, "size": abs_size, "result": result.get("status")})
-            except Exception as e:
-                closed.append({"coin": coin, "size": abs_size, "error": str(e)})
+        coin = p.get("coin", "")
+        is_buy = size < 0  # Close by doing opposite
+        orders.append({
+            "coin": coin,
+            "is_buy": is_buy,
+            "sz": abs(size),
+            "limit_px": _close_price(coin, is_buy, abs(size), book),
+            "order_type": {"limit": {"tif": "Ioc"}},
+            "reduce_only": True,
+        })
+    
+    closed = []
+    for order, (result_status, status) in zip(orders, _bulk_orders(exchange, orders)):
+        entry = {"coin": order["coin"], "size": order["sz"]}
+        if isinstance(status, dict) and status.get("error"):
+            entry["error"] = status["error"]
+        else:
+            entry["result"] = result_status
+        closed.append(entry)
     
-    print(json.dumps({"success": True, "closed": closed}))
+    return {"success": True, "closed": closed}
+
+def cmd_order_batch(orders):
+    """Place many orders with one signature and round trip per BATCH_SIZE chunk
+    
+    Args:
+        orders: List of SDK order requests, e.g.
+            {"coin": "BTC", "is_buy": True, "sz": 0.001, "limit_px": 90000,
+             "order_type": {"limit": {"tif": "Gtc"}}, "reduce_only": False}
+            `order_type` defaults to Gtc and `reduce_only` to False.
+    """
+    exchange, error = get_exchange()
+    if error:
+        return {"success": False, "error": error}
+    
+    try:
+        order_requests = []
+        for o in orders:
+            coin = o["coin"].upper()
+            order_requests.append({
+                "coin": coin,
+                "is_buy": bool(o["is_buy"]),
+                # Rounded like single orders, so an over-precise leg can't fail its chunk
+                "sz": round_size(coin, float(o["sz"])),
+                "limit_px": round_order_px(coin, float(o["limit_px"])),
+                "order_type": o.get("order_type") or {"limit": {"tif": "Gtc"}},
+                "reduce_only": bool(o.get("reduce_only", False)),
+            })
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        return {"success": False, "error": f"Invalid order spec: {e}"}
+    
+    results = []
+    for order, (_, status) in zip(order_requests, _bulk_orders(exchange, order_requests)):
+        results.append({"coin": order["coin"], **_order_status_result(status)})
+    
+    failed = sum(1 for r in results if not r["success"])
+    return {
+        "success": failed == 0,
+        "results": results,
+        "count": len(results),
+        "errorCount": failed,
+    }
+
+def cmd_cancel_batch(cancels):
+    """Cancel many orders with one signature and round trip per BATCH_SIZE chunk
+    
+    Args:
+        cancels: List of {"coin": "BTC", "oid": 123}
+    """
+    exchange, error = get_exchange()
+    if error:
+        return {"success": False, "error": error}
+    
+    try:
+        cancel_requests = [{"coin": c["coin"].upper(), "oid": int(c["oid"])} for c in cancels]
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        return {"success": False, "error": f"Invalid cancel spec: {e}"}
+    
+    cancelled = []
+    errors = []
+    for req, err in zip(cancel_requests, _bulk_cancel(exchange, cancel_requests)):
+        if err is None:
+            cancelled.append(req)
+        else:
+            errors.append({**req, "error": err})
+    
+    return {
+        "success": True,
+        "cancelled": cancelled,
+        "cancelledCount": len(cancelled),
+        "errors": errors,
+        "errorCount": len(errors)
+    }
 
 def cmd_trigger(coin, side, size, trigger_type, trigger_price):
     """Place a trigger order (stop loss or take profit)
@@ -262,39 +791,11 @@ def cmd_trigger(coin, side, size, trigger_type, trigger_price):
     """
     exchange, error = get_exchange()
     if error:
-        print(json.dumps({"success": False, "error": error}))
-        return
+        return {"success": False, "error": error}
     
-    info = get_info()
     is_buy = side.lower() == "buy"
-    size = float(size)
-    trigger_price = float(trigger_price)
-    
-    # Size decimals per asset
-    SZ_DECIMALS = {
-        'BTC': 4, 'ETH': 3, 'SOL': 2, 'XRP': 0, 'BNB': 2, 'DOGE': 0,
-        'ADA': 0, 'AVAX': 2, 'DOT': 1, 'LINK': 1, 'LTC': 2, 'BCH': 2,
-        'MATIC': 0, 'ARB': 0, 'OP': 0, 'SUI': 0, 'APT': 1, 'ATOM': 1,
-        'UNI': 1, 'NEAR': 0, 'FIL': 1, 'AAVE': 2, 'INJ': 1, 'TIA': 1,
-        'SEI': 0, 'FTM': 0, 'MKR': 3, 'TON': 1, 'TRX': 0, 'ETC': 1,
-        'HYPE': 1, 'MEGA': 0, 'PEPE': 0, 'WIF': 0, 'BONK': 0, 'TAO': 2,
-    }
-    sz_decimals = SZ_DECIMALS.get(coin, 2)
-    size = round(size, sz_decimals)
-    if sz_decimals == 0:
-        size = int(size)
-    
-    # Round trigger price appropriately
-    if trigger_price < 1:
-        trigger_price = round(trigger_price, 5)
-    elif trigger_price < 10:
-        trigger_price = round(trigger_price, 4)
-    elif trigger_price < 100:
-        trigger_price = round(trigger_price, 3)
-    elif trigger_price < 1000:
-        trigger_price = round(trigger_price, 2)
-    else:
-        trigger_price = round(trigger_price, 1)
+    size = round_size(coin, float(size))
+    trigger_price = round_order_px(coin, float(trigger_price))
     
     try:
         # Determine trigger condition based on order type and side
@@ -328,22 +829,22 @@ def cmd_trigger(coin, side, size, trigger_type, trigger_price):
             if statuses:
                 status = statuses[0]
                 if status.get("error"):
-                    print(json.dumps({"success": False, "error": status["error"]}))
+                    return {"success": False, "error": status["error"]}
                 elif status.get("resting"):
-                    print(json.dumps({
+                    return {
                         "success": True,
                         "oid": status["resting"].get("oid"),
                         "triggerType": trigger_type,
                         "triggerPrice": trigger_price,
-                    }))
+                    }
                 else:
-                    print(json.dumps({"success": True, "status": status}))
+                    return {"success": True, "status": status}
             else:
-                print(json.dumps({"success": True, "result": result}))
+                return {"success": True, "result": result}
         else:
-            print(json.dumps({"success": False, "error": str(result)}))
+            return {"success": False, "error": str(result)}
     except Exception as e:
-        print(json.dumps({"success": False, "error": str(e)}))
+        return {"success": False, **_action_error(e)}
 
 def cmd_open_orders():
     """Get all open orders for the account"""
@@ -353,9 +854,10 @@ def cmd_open_orders():
     try:
         open_orders = info.open_orders(account_address)
         
-        orders = []
-        for order in open_orders:
-            orders.append({
+        # Streamed by emit() one order at a time, so thousands of orders never
+        # sit in memory as one list plus one string
+        orders = (
+            {
                 "oid": order.get("oid"),
                 "coin": order.get("coin", ""),
                 "side": "buy" if order.get("side", "").lower() == "b" else "sell",
@@ -365,19 +867,20 @@ def cmd_open_orders():
                 "reduceOnly": order.get("reduceOnly", False),
                 "triggerPx": order.get("triggerPx"),
                 "tpsl": order.get("tpsl"),
-            })
+            }
+            for order in open_orders
+        )
         
-        result = {"success": True, "orders": orders, "count": len(orders)}
-        print(json.dumps(result))
+        result = {"success": True, "orders": JsonStream(orders), "count": len(open_orders)}
+        return result
     except Exception as e:
-        print(json.dumps({"success": False, "error": str(e)}))
+        return {"success": False, "error": str(e)}
 
 def cmd_cancel_all_orders(coin=None):
     """Cancel all open orders, optionally filtered by coin"""
     exchange, error = get_exchange()
     if error:
-        print(json.dumps({"success": False, "error": error}))
-        return
+        return {"success": False, "error": error}
     
     info = get_info()
     account_address = get_account_address()
@@ -385,9 +888,7 @@ def cmd_cancel_all_orders(coin=None):
     try:
         open_orders = info.open_orders(account_address)
         
-        cancelled = []
-        errors = []
-        
+        targets = []
         for order in open_orders:
             order_coin = order.get("coin", "")
             oid = order.get("oid")
@@ -397,14 +898,18 @@ def cmd_cancel_all_orders(coin=None):
                 continue
             
             if oid:
-                try:
-                    result = exchange.cancel(order_coin, int(oid))
-                    if result.get("status") == "ok":
-                        cancelled.append({"coin": order_coin, "oid": oid})
-                    else:
-                        errors.append({"coin": order_coin, "oid": oid, "error": str(result)})
-                except Exception as e:
-                    errors.append({"coin": order_coin, "oid": oid, "error": str(e)})
+                targets.append({"coin": order_coin, "oid": oid})
+        
+        cancel_requests = [{"coin": t["coin"], "oid": int(t["oid"])} for t in targets]
+        
+        cancelled = []
+        errors = []
+        
+        for target, err in zip(targets, _bulk_cancel(exchange, cancel_requests)):
+            if err is None:
+                cancelled.append(target)
+            else:
+                errors.append({**target, "error": err})
         
         result = {
             "success": True,
@@ -413,38 +918,35 @@ def cmd_cancel_all_orders(coin=None):
             "errors": errors,
             "errorCount": len(errors)
         }
-        print(json.dumps(result))
+        return result
     except Exception as e:
-        print(json.dumps({"success": False, "error": str(e)}))
+        return {"success": False, "error": str(e)}
+
+def _book_side(levels):
+    """Parse one side of an L2 book into (levels, total size, wall level)"""
+    parsed = [
+        {
+            "price": float(level.get("px", 0)),
+            "size": float(level.get("sz", 0)),
+            "numOrders": int(level.get("n", 0)),
+        }
+        for level in levels
+    ]
+    total = sum(level["size"] for level in parsed)
+    wall = max(parsed, key=lambda x: x["size"]) if parsed else None
+    return parsed, total, wall
 
 def cmd_orderbook(coin, depth=10):
     """Get L2 order book for a coin"""
     info = get_info()
     try:
         l2 = info.l2_snapshot(coin)
+        levels = l2.get("levels", [[],[]])
         
-        bids = []
-        asks = []
-        
-        # Parse bids (buy orders)
-        for level in l2.get("levels", [[],[]])[0][:depth]:
-            bids.append({
-                "price": float(level.get("px", 0)),
-                "size": float(level.get("sz", 0)),
-                "numOrders": int(level.get("n", 0)),
-            })
-        
-        # Parse asks (sell orders)
-        for level in l2.get("levels", [[],[]])[1][:depth]:
-            asks.append({
-                "price": float(level.get("px", 0)),
-                "size": float(level.get("sz", 0)),
-                "numOrders": int(level.get("n", 0)),
-            })
-        
-        # Calculate bid/ask walls (large orders)
-        bid_wall = max(bids, key=lambda x: x["size"]) if bids else None
-        ask_wall = max(asks, key=lambda x: x["size"]) if asks else None
+        # Parse bids (buy orders) and asks (sell orders), with totals and
+        # walls (largest resting size) per side
+        bids, total_bid_size, bid_wall = _book_side(levels[0][:depth])
+        asks, total_ask_size, ask_wall = _book_side(levels[1][:depth])
         
         # Calculate spread
         best_bid = bids[0]["price"] if bids else 0
@@ -452,8 +954,6 @@ def cmd_orderbook(coin, depth=10):
         spread = ((best_ask - best_bid) / best_bid * 100) if best_bid > 0 else 0
         
         # Calculate imbalance (positive = more buy pressure)
-        total_bid_size = sum(b["size"] for b in bids)
-        total_ask_size = sum(a["size"] for a in asks)
         imbalance = ((total_bid_size - total_ask_size) / (total_bid_size + total_ask_size) * 100) if (total_bid_size + total_ask_size) > 0 else 0
         
         result = {
@@ -471,74 +971,268 @@ def cmd_orderbook(coin, depth=10):
             "totalBidSize": round(total_bid_size, 4),
             "totalAskSize": round(total_ask_size, 4),
         }
-        print(json.dumps(result))
+        return result
     except Exception as e:
-        print(json.dumps({"success": False, "error": str(e)}))
+        return {"success": False, "error": str(e)}
 
-def main():
+def load_json_arg(argv, flag):
+    """Load the JSON passed as `flag <path|->` (or `flag=<...>`).
+    
+    '-' reads stdin; inline JSON ('[...]') is accepted too, which is what the daemon uses
+    since its stdin carries the request stream.
+    """
+    source = None
+    for i, arg in enumerate(argv):
+        if arg == flag and i + 1 < len(argv):
+            source = argv[i + 1]
+        elif arg.startswith(flag + "="):
+            source = arg.split("=", 1)[1]
+    if source is None:
+        raise ValueError(f"Missing {flag} <path|->")
+    if source.lstrip().startswith(("[", "{")):
+        return _load(source)
+    if source == "-":
+        if _SERVING:
+            raise ValueError("stdin is the request stream in serve mode, pass inline JSON")
+        return json.load(sys.stdin)
+    with open(source) as f:
+        return json.load(f)
+
+def _order_args(args):
+    """(coin, side, size, price) from the args after `order`"""
+    coin = args[0].upper()
+    side = args[1]
+    size = args[2]
+    # Handle both formats: "order COIN buy 0.1 123.45" and "order COIN buy 0.1 limit 123.45"
+    if len(args) > 3:
+        if args[3] == "limit":
+            price = args[4] if len(args) > 4 else None
+        else:
+            price = args[3]
+    else:
+        price = None
+    return coin, side, size, price
+
+def _run_order(args):
+    return cmd_order(*_order_args(args))
+
+def _run_order_batch(args):
+    try:
+        orders = load_json_arg(args, "--orders-json")
+    except (ValueError, OSError) as e:
+        return {"success": False, "error": f"Usage: order_batch --orders-json <path|-> ({e})"}
+    return cmd_order_batch(orders)
+
+def _run_cancel_batch(args):
+    try:
+        cancels = load_json_arg(args, "--cancels-json")
+    except (ValueError, OSError) as e:
+        return {"success": False, "error": f"Usage: cancel_batch --cancels-json <path|-> ({e})"}
+    return cmd_cancel_batch(cancels)
+
+# command -> (minimum positional args, usage, handler taking the args after the command)
+COMMANDS = {
+    "balance": (0, None, lambda args: cmd_balance()),
+    "positions": (0, None, lambda args: cmd_positions()),
+    "orderbook": (1, "orderbook <coin> [depth]",
+                  lambda args: cmd_orderbook(args[0].upper(), int(args[1]) if len(args) > 1 else 10)),
+    "order": (3, "order <coin> <buy|sell> <size> [limit] [price]", _run_order),
+    "cancel": (2, "cancel <coin> <oid>", lambda args: cmd_cancel(args[0].upper(), args[1])),
+    "trigger": (5, "trigger <coin> <buy|sell> <size> <sl|tp> <trigger_price>",
+                lambda args: cmd_trigger(args[0].upper(), args[1], args[2], args[3], args[4])),
+    "order_batch": (0, None, _run_order_batch),
+    "cancel_batch": (0, None, _run_cancel_batch),
+    "close_all": (0, None, lambda args: cmd_close_all()),
+    "open_orders": (0, None, lambda args: cmd_open_orders()),
+    # Cancel all orders, optionally for a specific coin
+    "cancel_all": (0, None, lambda args: cmd_cancel_all_orders(args[0].upper() if args else None)),
+}
+
+def run_command(argv):
+    """Run one command from an argv list (argv[0] is the script name) and return its result"""
     # Parse agent wallet arguments first
-    parse_agent_args()
+    try:
+        argv = parse_agent_args(argv)
+    except argparse.ArgumentError as e:
+        return {"success": False, "error": str(e)}
+    start_deadline()
+    
+    if len(argv) < 2:
+        return {"success": False, "error": "No command provided"}
+    
+    cmd = argv[1].lower()
+    entry = COMMANDS.get(cmd)
+    if entry is None:
+        return {"success": False, "error": f"Unknown command: {cmd}"}
+    
+    min_args, usage, handler = entry
+    args = argv[2:]
+    if len(args) < min_args:
+        return {"success": False, "error": f"Usage: {usage}"}
     
-    if len(sys.argv) < 2:
-        print(json.dumps({"success": False, "error": "No command provided"}))
+    try:
+        return handler(args)
+    finally:
+        if cmd in SIGNED_COMMANDS:
+            _USER_STATE_CACHE.clear()
+
+def _read_requests(requests):
+    """Feed stdin lines to the serve loop; None marks end of input"""
+    for line in sys.stdin:
+        line = line.strip()
+        if line:
+            requests.put(line)
+    requests.put(None)
+
+def _is_order_line(line):
+    """Cheap check for a plain `order` request, the only kind that is coalesced"""
+    try:
+        argv = _load(line).get("argv", [])
+        command = next((a for a in argv if not a.startswith("--")), "")
+        return command.lower() == "order"
+    except Exception:
+        return False
+
+def _next_batch(requests):
+    """Block for one request line; if it is an order, also take what arrives within the coalesce window"""
+    line = requests.get()
+    if line is None:
+        return None
+    
+    batch = [line]
+    if not _is_order_line(line):
+        return batch
+    deadline = time.monotonic() + COALESCE_WINDOW_SECS
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            line = requests.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if line is None:
+            requests.put(None)  # answer this batch first, stop on the next call
+            break
+        batch.append(line)
+        if not _is_order_line(line):
+            break  # it ends the run of orders anyway: don't hold it for the rest of the window
+    return batch
+
+def _coalesce_key(argv):
+    """(exchange, order request) for a plain `order` argv, or None if it must run on its own"""
+    try:
+        rest = parse_agent_args(argv)
+        if len(rest) < 5 or rest[1].lower() != "order":
+            return None
+        start_deadline()  # pricing may fetch mids over REST
+        exchange, error = get_exchange()
+        if error:
+            return None
+        order = _build_order(*_order_args(rest[2:]))
+        # An unknown coin fails the whole bulk action, so it runs (and fails) on its own
+        if order["coin"] not in exchange.info.name_to_coin:
+            return None
+        return exchange, order
+    except Exception:
+        return None  # run_command reports it
+
+def _run_request(argv):
+    try:
+        return run_command(argv)
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+def _reply(req_id, result, out):
+    """Emit one response; a result that fails to serialize becomes an error reply
+    instead of taking the daemon (and every queued request) down"""
+    try:
+        emit({"id": req_id, "result": result}, out)
+    except Exception as e:
+        emit({"id": req_id, "result": {"success": False, "error": f"Unserializable result: {e}"}}, out)
+
+def _flush_orders(run, out):
+    """Send a run of adjacent same-signer orders: alone via run_command, else as one bulk action"""
+    if len(run) == 1:
+        req_id, argv, _, _ = run[0]
+        _reply(req_id, _run_request(argv), out)
         return
     
-    cmd = sys.argv[1].lower()
-    
-    if cmd == "balance":
-        cmd_balance()
-    elif cmd == "positions":
-        cmd_positions()
-    elif cmd == "orderbook":
-        if len(sys.argv) < 3:
-            print(json.dumps({"success": False, "error": "Usage: orderbook <coin> [depth]"}))
-            return
-        coin = sys.argv[2].upper()
-        depth = int(sys.argv[3]) if len(sys.argv) > 3 else 10
-        cmd_orderbook(coin, depth)
-    elif cmd == "order":
-        if len(sys.argv) < 5:
-            print(json.dumps({"success": False, "error": "Usage: order <coin> <buy|sell> <size> [limit] [price]"}))
-            return
-        coin = sys.argv[2].upper()
-        side = sys.argv[3]
-        size = sys.argv[4]
-        # Handle both formats: "order COIN buy 0.1 123.45" and "order COIN buy 0.1 limit 123.45"
-        if len(sys.argv) > 5:
-            if sys.argv[5] == "limit":
-                price = sys.argv[6] if len(sys.argv) > 6 else None
-            else:
-                price = sys.argv[5]
+    exchange, first_argv = run[0][2], run[0][1]
+    # The run answers by the first order's deadline: its caller's clock started first
+    parse_agent_args(first_argv)
+    start_deadline()
+    try:
+        statuses = _bulk_orders(exchange, [order for _, _, _, order in run])
+    finally:
+        _USER_STATE_CACHE.clear()
+    for (req_id, _, _, _), (_, status) in zip(run, statuses):
+        _reply(req_id, _order_status_result(status), out)
+
+def _handle_batch(lines, out):
+    """Answer one batch of request lines in arrival order.
+    
+    Adjacent `order` requests for the same signer share one bulk_orders action; any
+    other request in between sends the run first, so nothing is reordered around it.
+    """
+    run = []  # [(request id, argv, exchange, order request)]
+    for line in lines:
+        req_id = None
+        try:
+            req = _load(line)
+            req_id = req.get("id")
+            argv = [sys.argv[0]] + list(req.get("argv", []))
+        except Exception as e:
+            _reply(req_id, {"success": False, "error": str(e)}, out)
+            continue
+        
+        key = _coalesce_key(argv) if len(lines) > 1 else None
+        if run and (key is None or key[0] is not run[0][2]):
+            _flush_orders(run, out)
+            run = []
+        if key is None:
+            _reply(req_id, _run_request(argv), out)
         else:
-            price = None
-        cmd_order(coin, side, size, price)
-    elif cmd == "cancel":
-        if len(sys.argv) < 4:
-            print(json.dumps({"success": False, "error": "Usage: cancel <coin> <oid>"}))
-            return
-        coin = sys.argv[2].upper()
-        oid = sys.argv[3]
-        cmd_cancel(coin, oid)
-    elif cmd == "trigger":
-        if len(sys.argv) < 7:
-            print(json.dumps({"success": False, "error": "Usage: trigger <coin> <buy|sell> <size> <sl|tp> <trigger_price>"}))
-            return
-        coin = sys.argv[2].upper()
-        side = sys.argv[3]
-        size = sys.argv[4]
-        trigger_type = sys.argv[5]  # 'sl' or 'tp'
-        trigger_price = sys.argv[6]
-        cmd_trigger(coin, side, size, trigger_type, trigger_price)
-    elif cmd == "close_all":
-        cmd_close_all()
-    elif cmd == "open_orders":
-        cmd_open_orders()
-    elif cmd == "cancel_all":
-        # Cancel all orders, optionally for a specific coin
-        coin = sys.argv[2].upper() if len(sys.argv) > 2 else None
-        cmd_cancel_all_orders(coin)
-    else:
-        print(json.dumps({"success": False, "error": f"Unknown command: {cmd}"}))
+            run.append((req_id, argv, *key))
+    
+    if run:
+        _flush_orders(run, out)
+
+def serve():
+    """Daemon mode: handle one JSON request per stdin line, answer on stdout"""
+    global _SERVING
+    _SERVING = True
+    
+    # Responses own stdout; anything else that prints (e.g. the SDK's websocket
+    # thread) goes to stderr so it can't corrupt the protocol
+    out = sys.stdout
+    sys.stdout = sys.stderr
+    
+    try:
+        get_info()  # warm the REST client and meta before the first request
+        start_mids_stream()
+    except Exception as e:
+        print(f"[hl_bridge] allMids stream unavailable, using REST mids: {e}", file=sys.stderr)
+    
+    # stdin is read on its own thread so requests can queue up while one is in flight
+    requests = queue.Queue()
+    threading.Thread(target=_read_requests, args=(requests,), daemon=True).start()
+    
+    try:
+        while True:
+            batch = _next_batch(requests)
+            if batch is None:
+                break
+            _handle_batch(batch, out)
+    finally:
+        stop_mids_stream()
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        serve()
+        return
+    
+    emit(run_command(sys.argv))
 
 if __name__ == "__main__":
     main()
@@ -2,18 +2,36 @@
  * Async Python Bridge Executor
  * 
  * Provides async execution of the hl_bridge.py script with:
+ * - A persistent `hl_bridge.py serve` daemon (no Python cold start per command)
  * - Timeout handling
  * - Retry with exponential backoff
  * - Non-blocking execution
+ *
+ * Set HL_BRIDGE_DAEMON=false to fall back to one process per command, and
+ * HL_BRIDGE_POOL_SIZE for the number of daemons wallets are spread over.
  */
 
-import { spawn } from 'child_process';
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process';
+import readline from 'readline';
 import path from 'path';
 
 const SCRIPT_PATH = path.resolve(process.cwd(), '../../scripts/hl_bridge.py');
+const BRIDGE_CWD = path.resolve(process.cwd(), '../..');
+const USE_DAEMON = process.env['HL_BRIDGE_DAEMON'] !== 'false';
+const POOL_SIZE = Math.max(1, parseInt(process.env['HL_BRIDGE_POOL_SIZE'] || '2', 10) || 1);
 const DEFAULT_TIMEOUT = 30000; // 30 seconds
 const MAX_RETRIES = 3;
 const INITIAL_BACKOFF = 1000; // 1 second
+// A one-shot process spends part of its timeout importing the SDK before any HTTP call
+const SPAWN_STARTUP_MS = 2000;
+
+// Commands that sign and post an action: a timed-out one may still have reached the exchange
+const SIGNED_COMMANDS = new Set(['order', 'cancel', 'trigger', 'close_all', 'cancel_all', 'order_batch', 'cancel_batch']);
+
+function isSignedCommand(args: string[]): boolean {
+  const command = args.find(a => !a.startsWith('--'));
+  return command !== undefined && SIGNED_COMMANDS.has(command);
+}
 
 export interface BridgeResult {
   success: boolean;
@@ -46,15 +64,14 @@ export interface PositionsResult extends BridgeResult {
 }
 
 /**
- * Execute Python bridge command asynchronously
+ * Execute Python bridge command in a one-shot process
  */
-async function execBridgeAsync(
+function execBridgeSpawn(
   args: string[],
   timeout: number = DEFAULT_TIMEOUT
 ): Promise<BridgeResult> {
   return new Promise((resolve) => {
-    const cwd = path.resolve(process.cwd(), '../..');
-    const proc = spawn('python', [SCRIPT_PATH, ...args], { cwd });
+    const proc = spawn('python', [SCRIPT_PATH, ...args], { cwd: BRIDGE_CWD });
     
     let stdout = '';
     let stderr = '';
@@ -103,6 +120,175 @@ async function execBridgeAsync(
   });
 }
 
+interface PendingRequest {
+  daemon: Daemon;
+  resolve: (result: BridgeResult) => void;
+  timeout: number;
+  // A plain `order`: the daemon may send it in one bulk action with adjacent orders
+  coalescible: boolean;
+  // Armed only once the daemon is running this request, not while it waits in line
+  timeoutId?: NodeJS.Timeout;
+}
+
+interface Daemon {
+  proc: ChildProcessWithoutNullStreams;
+  queue: number[]; // request ids in the order they were written; the head is running
+}
+
+// One slot per daemon; a wallet always maps to the same slot (see daemonSlot)
+const daemons: Array<Daemon | null> = new Array(POOL_SIZE).fill(null);
+let nextRequestId = 1;
+const pending = new Map<number, PendingRequest>();
+
+/**
+ * Resolve every in-flight request owned by a daemon with an error
+ */
+function failPending(daemon: Daemon, error: string): void {
+  for (const id of daemon.queue) {
+    const req = pending.get(id);
+    if (!req) continue;
+    pending.delete(id);
+    clearTimeout(req.timeoutId);
+    req.resolve({ success: false, error });
+  }
+  daemon.queue = [];
+}
+
+/**
+ * Start the timeout of the request the daemon is now running
+ */
+function armHead(daemon: Daemon): void {
+  const id = daemon.queue[0];
+  if (id === undefined) return;
+  const req = pending.get(id);
+  if (!req || req.timeoutId) return;
+  
+  req.timeoutId = setTimeout(() => {
+    if (!pending.has(id)) return;
+    pending.delete(id);
+    daemon.queue.shift();
+    req.resolve({ success: false, error: `Timeout after ${req.timeout}ms` });
+    
+    // Orders right behind a stuck order may be in the same bulk action, so they fail as
+    // timeouts too (never retried). The rest of the queue never ran and fails with the
+    // daemon's exit, which is safe to retry.
+    if (req.coalescible) {
+      while (daemon.queue.length > 0) {
+        const queuedId = daemon.queue[0]!;
+        const queued = pending.get(queuedId);
+        if (queued && !queued.coalescible) break;
+        daemon.queue.shift();
+        if (!queued) continue;
+        pending.delete(queuedId);
+        queued.resolve({ success: false, error: `Timeout: sent with an order that timed out after ${req.timeout}ms` });
+      }
+    }
+    
+    // This call is the one the daemon is stuck on (past its own deadline): restart it
+    daemon.proc.kill('SIGTERM');
+  }, req.timeout);
+}
+
+/**
+ * Pick a daemon slot from the wallet flags, so each signer's actions stay serial
+ * in one process (HL nonces are per-signer timestamps) while other wallets run in parallel
+ */
+function daemonSlot(args: string[]): number {
+  const wallet = args.filter(a => a.startsWith('--agent-key') || a.startsWith('--master')).join(' ');
+  let hash = 0;
+  for (let i = 0; i < wallet.length; i++) {
+    hash = (hash * 31 + wallet.charCodeAt(i)) | 0;
+  }
+  return Math.abs(hash) % POOL_SIZE;
+}
+
+/**
+ * Get the running bridge daemon for a slot, starting it if needed
+ */
+function getDaemon(slot: number): Daemon {
+  const existing = daemons[slot];
+  if (existing) return existing;
+  
+  const proc = spawn('python', [SCRIPT_PATH, 'serve'], { cwd: BRIDGE_CWD });
+  const daemon: Daemon = { proc, queue: [] };
+  let stderr = '';
+  
+  readline.createInterface({ input: proc.stdout }).on('line', (line) => {
+    let message: { id?: number; result?: any };
+    try {
+      message = JSON.parse(line);
+    } catch (e) {
+      console.error(`[Bridge] Invalid JSON from daemon: ${line}`);
+      return;
+    }
+    
+    const req = message.id !== undefined ? pending.get(message.id) : undefined;
+    if (!req) return;
+    pending.delete(message.id!);
+    clearTimeout(req.timeoutId);
+    const index = daemon.queue.indexOf(message.id!);
+    if (index !== -1) daemon.queue.splice(index, 1);
+    req.resolve({ success: true, data: message.result });
+    armHead(daemon);
+  });
+  
+  proc.stderr.on('data', (data) => {
+    // Keep only the tail so a chatty daemon can't grow this forever
+    stderr = (stderr + data.toString()).slice(-4000);
+  });
+  
+  proc.stdin.on('error', (err) => {
+    failPending(daemon, err.message);
+  });
+  
+  proc.on('close', (code) => {
+    if (daemons[slot] === daemon) daemons[slot] = null;
+    failPending(daemon, stderr || `Bridge daemon exited with code ${code}`);
+  });
+  
+  proc.on('error', (err) => {
+    if (daemons[slot] === daemon) daemons[slot] = null;
+    failPending(daemon, err.message);
+  });
+  
+  daemons[slot] = daemon;
+  console.log(`[Bridge] Started hl_bridge.py daemon ${slot + 1}/${POOL_SIZE}`);
+  return daemon;
+}
+
+/**
+ * Execute Python bridge command on the persistent daemon for its wallet
+ */
+function execBridgeDaemon(
+  args: string[],
+  timeout: number = DEFAULT_TIMEOUT
+): Promise<BridgeResult> {
+  return new Promise((resolve) => {
+    const daemon = getDaemon(daemonSlot(args));
+    const id = nextRequestId++;
+    
+    pending.set(id, { daemon, resolve, timeout, coalescible: args.find(a => !a.startsWith('--')) === 'order' });
+    daemon.queue.push(id);
+    armHead(daemon);
+    daemon.proc.stdin.write(JSON.stringify({ id, argv: args }) + '\n');
+  });
+}
+
+/**
+ * Execute Python bridge command asynchronously
+ */
+async function execBridgeAsync(
+  args: string[],
+  timeout: number = DEFAULT_TIMEOUT
+): Promise<BridgeResult> {
+  // The bridge fits its HTTP calls inside this budget, so it answers (with a timeout
+  // error and hint) before we give up on it and kill the process mid-request
+  if (USE_DAEMON) {
+    return execBridgeDaemon([`--timeout-ms=${timeout}`, ...args], timeout);
+  }
+  return execBridgeSpawn([`--timeout-ms=${Math.max(timeout - SPAWN_STARTUP_MS, 1000)}`, ...args], timeout);
+}
+
 /**
  * Execute with retry and exponential backoff
  */
@@ -127,6 +313,11 @@ async function execWithRetry(
       return result;
     }
     
+    // A signed action that timed out may already be on the book: resending could double it
+    if (lastError.startsWith('Timeout') && isSignedCommand(args)) {
+      return result;
+    }
+    
     // Exponential backoff
     if (attempt < maxRetries - 1) {
       const backoff = INITIAL_BACKOFF * Math.pow(2, attempt);
@@ -383,10 +574,12 @@ export async function getOpenOrders(agentArgs: string = ''): Promise<OpenOrdersR
   const result = await execWithRetry(args);
   
   if (result.success && result.data) {
+    // streamError: the bridge hit a bad order mid-stream, so the list is incomplete
     return {
-      success: true,
+      success: !result.data.streamError,
       orders: result.data.orders || [],
       count: result.data.count || 0,
+      error: result.data.streamError,
     };
   }
   
@@ -426,6 +619,109 @@ export async function cancelAllOrders(coin?: string, agentArgs: string = ''): Pr
   return { success: false, error: result.error };
 }
 
+/**
+ * One leg of a batch order (Hyperliquid SDK order request shape)
+ */
+export interface BatchOrderRequest {
+  coin: string;
+  is_buy: boolean;
+  sz: number;
+  limit_px: number;
+  order_type?: { limit: { tif: 'Gtc' | 'Ioc' | 'Alo' } } | { trigger: { triggerPx: number; isMarket: boolean; tpsl: 'tp' | 'sl' } };
+  reduce_only?: boolean;
+}
+
+/**
+ * Batch order result
+ */
+export interface OrderBatchResult extends BridgeResult {
+  results?: Array<{ coin: string; success: boolean; oid?: number; filled?: boolean; avgPx?: string; totalSz?: string; error?: string }>;
+  count?: number;
+  errorCount?: number;
+}
+
+/**
+ * Place many orders at once (one signature + round trip per 50 legs)
+ */
+export async function executeOrderBatch(orders: BatchOrderRequest[], agentArgs: string = ''): Promise<OrderBatchResult> {
+  const batchArgs = ['order_batch', `--orders-json=${JSON.stringify(orders)}`];
+  const args = agentArgs 
+    ? [...agentArgs.split(' ').filter(a => a), ...batchArgs]
+    : batchArgs;
+  
+  // No retry: a timed-out batch may have partially reached the book
+  const result = await execWithRetry(args, 1, 15000);
+  
+  if (result.success && result.data) {
+    return {
+      success: result.data.success !== false,
+      results: result.data.results || [],
+      count: result.data.count || 0,
+      errorCount: result.data.errorCount || 0,
+      error: result.data.error,
+    };
+  }
+  
+  return { success: false, error: result.error };
+}
+
+/**
+ * Cancel many orders at once (one signature + round trip per 50 cancels)
+ */
+export async function cancelOrderBatch(
+  cancels: Array<{ coin: string; oid: string | number }>,
+  agentArgs: string = ''
+): Promise<CancelAllResult> {
+  const batchArgs = ['cancel_batch', `--cancels-json=${JSON.stringify(cancels)}`];
+  const args = agentArgs 
+    ? [...agentArgs.split(' ').filter(a => a), ...batchArgs]
+    : batchArgs;
+  
+  const result = await execWithRetry(args, 2, 15000);
+  
+  if (result.success && result.data) {
+    return {
+      success: result.data.success !== false,
+      cancelledCount: result.data.cancelledCount || 0,
+      errorCount: result.data.errorCount || 0,
+      cancelled: result.data.cancelled || [],
+      errors: result.data.errors || [],
+      error: result.data.error,
+    };
+  }
+  
+  return { success: false, error: result.error };
+}
+
+/**
+ * Close all positions result
+ */
+export interface CloseAllResult extends BridgeResult {
+  closed?: Array<{ coin: string; size: number; result?: string; error?: string }>;
+}
+
+/**
+ * Close every open position (reduce-only IOC orders priced off the book)
+ */
+export async function closeAllPositions(agentArgs: string = ''): Promise<CloseAllResult> {
+  const args = agentArgs 
+    ? [...agentArgs.split(' ').filter(a => a), 'close_all']
+    : ['close_all'];
+  
+  // Reduce-only, so a retry can't overshoot a position that already closed
+  const result = await execWithRetry(args, 2, 30000);
+  
+  if (result.success && result.data) {
+    return {
+      success: result.data.success !== false,
+      closed: result.data.closed || [],
+      error: result.data.error,
+    };
+  }
+  
+  return { success: false, error: result.error };
+}
+
 /**
  * Close position for a coin
  */
@@ -507,7 +803,10 @@ export default {
   placeTakeProfit,
   cancelOrder,
   cancelAllOrders,
+  executeOrderBatch,
+  cancelOrderBatch,
   getOpenOrders,
+  closeAllPositions,
   closePosition,
   getOrderBook,
 };
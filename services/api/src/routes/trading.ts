@@ -1615,16 +1615,10 @@ export const tradingRoutes: FastifyPluginAsync = async (fastify) => {
 
     try {
       // Use Python bridge for trading (official SDK)
-      const { execSync } = await import('child_process');
-      const path = await import('path');
-      const scriptPath = path.resolve(process.cwd(), '../../scripts/hl_bridge.py');
-
       console.log(`[TEST] 🧪 Opening test ${side} position: ${size} BTC`);
 
       // Open position using Python bridge
-      const openCmd = `python "${scriptPath}" order BTC ${side} ${size} market`;
-      const openOutput = execSync(openCmd, { encoding: 'utf-8', cwd: path.resolve(process.cwd(), '../..') });
-      const openResult = JSON.parse(openOutput.trim());
+      const openResult = await pythonBridge.executeMarketOrder('BTC', side, size);
 
       if (!openResult.success) {
         return { success: false, error: `Failed to open: ${openResult.error}`, step: 'open' };
@@ -1639,25 +1633,21 @@ export const tradingRoutes: FastifyPluginAsync = async (fastify) => {
       const closeSide = side === 'buy' ? 'sell' : 'buy';
       console.log(`[TEST] 🔄 Closing position with ${closeSide}...`);
 
-      const closeCmd = `python "${scriptPath}" order BTC ${closeSide} ${size} market`;
-      const closeOutput = execSync(closeCmd, { encoding: 'utf-8', cwd: path.resolve(process.cwd(), '../..') });
-      const closeResult = JSON.parse(closeOutput.trim());
+      const closeResult = await pythonBridge.executeMarketOrder('BTC', closeSide, size);
 
       if (!closeResult.success) {
         return { 
           success: false, 
           error: `Failed to close: ${closeResult.error}`, 
           step: 'close',
-          openOrder: openResult.order 
+          openOrder: openResult 
         };
       }
 
       console.log(`[TEST] ✅ Position closed:`, closeResult);
 
       // Get final account state using Python bridge
-      const balanceCmd = `python "${scriptPath}" balance`;
-      const balanceOutput = execSync(balanceCmd, { encoding: 'utf-8', cwd: path.resolve(process.cwd(), '../..') });
-      const balanceResult = JSON.parse(balanceOutput.trim());
+      const balanceResult = await pythonBridge.getBalance();
 
       return {
         success: true,
@@ -1679,12 +1669,7 @@ export const tradingRoutes: FastifyPluginAsync = async (fastify) => {
    */
   fastify.get('/positions', async () => {
     try {
-      const { execSync } = await import('child_process');
-      const path = await import('path');
-      const scriptPath = path.resolve(process.cwd(), '../../scripts/hl_bridge.py');
-      const cmd = `python "${scriptPath}" positions`;
-      const output = execSync(cmd, { encoding: 'utf-8', cwd: path.resolve(process.cwd(), '../..') });
-      return JSON.parse(output.trim());
+      return await pythonBridge.getPositions();
     } catch (error) {
       return { success: false, error: (error as Error).message, positions: [] };
     }
@@ -1702,10 +1687,6 @@ export const tradingRoutes: FastifyPluginAsync = async (fastify) => {
     }
 
     try {
-      // Get current position info before closing
-      const { execSync } = await import('child_process');
-      const path = await import('path');
-      
       // Get current price
       const tickerRes = await fetch('https://api.hyperliquid.xyz/info', {
         method: 'POST',
@@ -1727,10 +1708,7 @@ export const tradingRoutes: FastifyPluginAsync = async (fastify) => {
       }
       
       // Close the position
-      const scriptPath = path.resolve(process.cwd(), '../../scripts/hl_bridge.py');
-      const cmd = `python "${scriptPath}" ${agentArgs} close_all`;
-      const output = execSync(cmd, { encoding: 'utf-8', cwd: path.resolve(process.cwd(), '../..') });
-      const result = JSON.parse(output.trim());
+      const result = await pythonBridge.closeAllPositions(agentArgs);
       
       if (result.success && openTrade) {
         // Calculate PnL
@@ -1828,12 +1806,7 @@ export const tradingRoutes: FastifyPluginAsync = async (fastify) => {
     }
 
     try {
-      const { execSync } = await import('child_process');
-      const path = await import('path');
-      const scriptPath = path.resolve(process.cwd(), '../../scripts/hl_bridge.py');
-      const cmd = `python "${scriptPath}" close_all`;
-      const output = execSync(cmd, { encoding: 'utf-8', cwd: path.resolve(process.cwd(), '../..') });
-      const result = JSON.parse(output.trim());
+      const result = await pythonBridge.closeAllPositions();
       
       return {
         success: result.success,
@@ -1906,10 +1879,6 @@ export const tradingRoutes: FastifyPluginAsync = async (fastify) => {
       // Execute real trade if requested
       let tradeResult = null;
       if (executeReal && confidence >= 70) {
-        const { execSync } = await import('child_process');
-        const path = await import('path');
-        const scriptPath = path.resolve(process.cwd(), '../../scripts/hl_bridge.py');
-        
         // Use fixed minimum size for testing (0.001 BTC ≈ $87)
         const positionSize = 0.001;
         
@@ -1918,14 +1887,12 @@ export const tradingRoutes: FastifyPluginAsync = async (fastify) => {
           
           console.log(`[SIMULATE] 📊 Executing ${side} ${positionSize.toFixed(6)} BTC @ $${btcPrice}`);
           
-          const orderCmd = `python "${scriptPath}" order BTC ${side} ${positionSize.toFixed(6)} market`;
-          const orderOutput = execSync(orderCmd, { encoding: 'utf-8', cwd: path.resolve(process.cwd(), '../..') });
-          tradeResult = JSON.parse(orderOutput.trim());
+          tradeResult = await pythonBridge.executeMarketOrder('BTC', side, positionSize);
 
           if (tradeResult.success) {
             // Calculate entry fee
-            const tradePrice = parseFloat(tradeResult.avgPx) || btcPrice;
-            const tradeQty = parseFloat(tradeResult.totalSz) || positionSize;
+            const tradePrice = tradeResult.avgPx || btcPrice;
+            const tradeQty = tradeResult.totalSz || positionSize;
             const entryFee = tradePrice * tradeQty * HL_TAKER_FEE;
             
             // Add to trade history
@@ -2081,6 +2048,16 @@ const MAX_LEVERAGE_BY_PAIR: Record<string, number> = {
   'FARTCOIN-PERP': 5, 'AI16Z-PERP': 5, 'VIRTUAL-PERP': 5, 'GRIFFAIN-PERP': 5,
 };
 
+// Size decimals per asset, built once (hl_bridge.py reads these from live exchange metadata)
+const SZ_DECIMALS: Readonly<Record<string, number>> = Object.freeze({
+  'BTC': 4, 'ETH': 3, 'SOL': 2, 'XRP': 0, 'BNB': 2, 'DOGE': 0,
+  'ADA': 0, 'AVAX': 2, 'DOT': 1, 'LINK': 1, 'LTC': 2, 'BCH': 2,
+  'MATIC': 0, 'ARB': 0, 'OP': 0, 'SUI': 0, 'APT': 1, 'ATOM': 1,
+  'UNI': 1, 'NEAR': 0, 'FIL': 1, 'AAVE': 2, 'INJ': 1, 'TIA': 1,
+  'SEI': 0, 'FTM': 0, 'MKR': 3, 'TON': 1, 'TRX': 0, 'ETC': 1,
+  'HYPE': 1, 'MEGA': 0, 'PEPE': 0, 'WIF': 0, 'BONK': 0, 'TAO': 2,
+});
+
 // Get max leverage for a symbol (default to 5x for unknown/low liquidity pairs)
 // This allows ANY Hyperliquid pair to work, not just the ones in the list
 function getMaxLeverageForSymbol(symbol: string): number {
@@ -5611,15 +5588,6 @@ async function forceTradeOnSymbol(symbol: string, direction: 'long' | 'short') {
     const positionSizePct = botSettings.positionSizePct || 2;
     let { size: positionSize, notional } = calculatePositionSize(equity, positionSizePct, currentPrice);
     
-    // Size decimals per asset (must match hl_bridge.py)
-    const SZ_DECIMALS: Record<string, number> = {
-      'BTC': 4, 'ETH': 3, 'SOL': 2, 'XRP': 0, 'BNB': 2, 'DOGE': 0,
-      'ADA': 0, 'AVAX': 2, 'DOT': 1, 'LINK': 1, 'LTC': 2, 'BCH': 2,
-      'MATIC': 0, 'ARB': 0, 'OP': 0, 'SUI': 0, 'APT': 1, 'ATOM': 1,
-      'UNI': 1, 'NEAR': 0, 'FIL': 1, 'AAVE': 2, 'INJ': 1, 'TIA': 1,
-      'SEI': 0, 'FTM': 0, 'MKR': 3, 'TON': 1, 'TRX': 0, 'ETC': 1,
-      'HYPE': 1, 'MEGA': 0, 'PEPE': 0, 'WIF': 0, 'BONK': 0, 'TAO': 2,
-    };
     const szDecimals = SZ_DECIMALS[coinName] ?? 2;
     
     // Ensure minimum notional of $12 for HyperLiquid (with margin for rounding)